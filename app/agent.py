@@ -1,9 +1,33 @@
 import random
-import hashlib
-from typing import Dict, Any, Optional, List
+import sys
+from enum import IntEnum
+from types import MappingProxyType
+from functools import lru_cache
+from typing import Dict, Any, NamedTuple, Optional, List
 
 
-PERSONA = {
+class Stage(IntEnum):
+    """Conversation stages as ints so the hot dispatch compares integers
+    (and can use bitmask membership tests) instead of hashing strings."""
+    RECON = 0
+    SOCIAL_ENGINEERING = 1
+    URGENCY = 2
+    PAYMENT_REQUEST = 3
+    PHISHING = 4
+    OTP_FRAUD = 5
+    REWARD_LURE = 6
+    BENIGN = 7
+    UNKNOWN = 8
+
+
+_STAGE_ID = {s.name: s for s in Stage}
+
+# Stages where a missing link is worth chasing (bitmask membership test).
+_LINK_STAGES_MASK = (1 << Stage.SOCIAL_ENGINEERING) | (1 << Stage.URGENCY)
+
+
+# Read-only so the shared persona can't be mutated at runtime.
+PERSONA = MappingProxyType({
     "name": "Rahul",
     "style": "non-technical, polite, slightly anxious, cooperative",
     "constraints": [
@@ -13,78 +37,402 @@ PERSONA = {
         "Sound natural and human.",
         "Keep messages short (1-2 lines)."
     ]
+})
+
+# Bound once: every activated decision carries this string, so skip the
+# mapping lookup per call and intern it for pointer-equality comparisons.
+_PERSONA_STYLE = sys.intern(PERSONA["style"])
+
+
+# -----------------------------
+# ✅ Reply pools (module-level, built once)
+# -----------------------------
+# These were local lists inside generate_reply, rebuilt on every call.
+# Tuples at module scope = zero per-call allocation, _pick works on any sequence.
+_SOFT_OPENERS = (
+    "I’m a bit confused. Can you explain what I need to do?",
+    "Okay… what exactly is the issue with my account?",
+    "I don’t understand this. What should I do step by step?",
+    "Wait—ye message kis number/email se aaya hai?",
+    "Aap bol rahe ho verify… but verify kis cheez ka?"
+)
+
+_ASK_LINK = (
+    "Can you send the official verification link again? The page didn’t open.",
+    "Please share the exact link. I want to make sure I’m on the right site.",
+    "The link isn’t loading—send the correct URL once more.",
+    "Mere phone pe link broken aa raha hai—copy-paste karke dubara bhejo."
+)
+
+_PHISHING_FOLLOWUP = (
+    "I opened it. It’s asking for details—what exactly should I fill?",
+    "It’s asking for OTP/UPI PIN—are you sure this is required?",
+    "It’s asking for netbanking/login—verification me login kyu chahiye?"
+)
+
+_PHISHING_PAYMENT_FOLLOWUP = (
+    "UPI me receiver name kya dikh raha hai? I want to confirm before paying.",
+    "Payment fail ho gaya to kya bank transfer karna hai? Account + IFSC bhej do.",
+    "Amount kitna exactly dalna hai? And receiver name confirm kar do."
+)
+
+_ASK_UPI = (
+    "Which exact UPI ID should I use? Please send it again.",
+    "Can you share the UPI handle (like name@bank) so I don’t type wrong?",
+    "UPI ID ke saath receiver name bhi bata do—confirm karna hai."
+)
+
+_ASK_RECEIVER_OR_COLLECT = (
+    "Receiver name kya aayega? (UPI pe jo name show hota hai) I want to confirm.",
+    "Can you send a collect request? I’m not able to type the UPI ID correctly.",
+    "If this UPI fails, do you have another UPI ID I can try?"
+)
+
+_ASK_BANK = (
+    "If UPI isn’t working, can you share bank details (A/C + IFSC + name)?",
+    "Please send the account number and IFSC—my app asks for those.",
+    "Can you share beneficiary bank details so I can complete verification?"
+)
+
+_ASK_IFSC_ONLY = (
+    "IFSC code bhi bhej do please. App IFSC maang raha hai.",
+    "Receiver bank ka IFSC kya hai? Without IFSC it’s not allowing."
+)
+
+_BANK_CONFIRM = (
+    "Thanks. Beneficiary name exactly kya hai? (bank me jo name show hota hai)",
+    "Which bank/branch is this IFSC for? I want to confirm before transfer.",
+    "Account type savings/current kya hai? Wrong type se fail ho jata hai."
+)
+
+_ASK_CONTACT_DETAILS = (
+    "Aapka support number kya hai? Call karke confirm karna hai.",
+    "Official email ID bhej do, I’ll forward screenshot there.",
+    "Koi ticket/reference number hai? Main note kar leta hoon."
+)
+
+_OTP_SENDER = (
+    "Message me sender name kya dikh raha hai? Main confirm karna chahta hoon.",
+    "OTP wale SMS me sender ID kya hai? (SBI/VM-… ) bas bata do.",
+    "SMS me bank ka naam clear likha hai kya? Sender ID kya show ho raha hai?"
+)
+
+_OTP_SMS_TEXT = (
+    "OTP aaya hai—but SMS me exact line kya likhi hai? Copy karke bhejo.",
+    "OTP SMS me time/validity kitni likhi hai? 5 min/10 min?",
+    "SMS me ‘for login’ ya ‘for payment’ aisa kuch likha hai kya? Exact words batao."
+)
+
+_OTP_PURPOSE = (
+    "OTP share karna safe nahi lag raha. Ye login ka OTP hai ya payment ka?",
+    "Ye OTP account access ke liye hai ya transaction confirm karne ke liye?",
+    "App me aapne kya action kiya jisse OTP aaya? Link open kiya ya payment click?"
+)
+
+_OTP_SAFE_ALT = (
+    "Main OTP nahi share kar sakta—kya aap alternative verification (reference number) de sakte ho?",
+    "OTP share nahi karunga—koi customer care number do, main call karke confirm kar leta hoon.",
+    "OTP ke bina koi verification step hai? Like registered email confirm ya ticket number?"
+)
+
+_OTP_FALLBACK = (
+    "Ek baar confirm: OTP kis service/app ke liye generate hua? (SBI YONO / netbanking / UPI?)",
+    "OTP ke SMS me last 4 digits ya masked info aata hai kya? (Bas confirm karna.)",
+    "OTP me kisi merchant ka naam dikh raha? Agar haan to kaunsa?"
+)
+
+# Turn >= 4 pool, concatenated once here instead of per OTP turn.
+_OTP_MIXED = _OTP_SAFE_ALT + _OTP_PURPOSE + _OTP_FALLBACK
+
+# OTP probe bucket by (clamped) turn index: turns 0-1 ask the sender,
+# turn 2 the SMS text, turn 3 the purpose; later turns use _OTP_MIXED.
+_OTP_BY_TURN = (_OTP_SENDER, _OTP_SENDER, _OTP_SMS_TEXT, _OTP_PURPOSE)
+
+# Single source for benign-path help lines; this used to be duplicated as
+# two slightly diverged local lists in generate_reply and agent_decision.
+_BENIGN_HELP = (
+    "Aap kaunsa app use karte ho (GPay/PhonePe/Paytm)? Main safe steps bata deta hoon.",
+    "UPI PIN reset ke liye app me ‘Forgot UPI PIN’ / ‘Reset PIN’ option hota hai—kaunsa app hai?",
+    "PIN reset ke liye debit card details + OTP lagta hai. Aap kaunsa bank/app use kar rahe ho?",
+    "Aapka issue exactly kya hai—payment fail, PIN issue, ya account warning?",
+    "App me error code aa raha hai kya? (Bas code bata do.)"
+)
+
+_FOLLOWUPS = (
+    "Okay, I noted that. What’s the next step?",
+    "Done. If it fails again, what should I do?",
+    "Can you confirm receiver name once more?"
+)
+
+_STAGE_PROMPTS = {
+    "RECON": ("Hi, yes—what is this about?", "Hello. Which service are you calling from?"),
+    "SOCIAL_ENGINEERING": ("I’m worried now. What verification is needed?", "Why is my account suspended? I didn’t do anything."),
+    "URGENCY": ("Okay okay, I don’t want it blocked. What do I do now?", "Please guide quickly. I’m not technical."),
+    "PAYMENT_REQUEST": ("You’re asking payment… I need exact details so I don’t make a mistake.", "I can do it, but tell me the exact ID/link."),
+    "PHISHING": ("I clicked but it looks different.", "The site is asking too many things."),
+    "OTP_FRAUD": ("OTP? But why OTP is needed for this?", "I got OTP, but I’m scared to share. What is it for?"),
+    "REWARD_LURE": ("Really? What do I need to do to claim it?", "Okay… what’s the process for the reward?"),
+    "BENIGN": ("Haan bolo—kya help chahiye?", "Okay, I can help. What exactly is the issue?"),
+    "UNKNOWN": ("Can you clarify what you need from me?", "What is this regarding? Please explain.")
 }
 
+# Every pooled line is served many times over a session; interning once at
+# import makes all responses share a single PyObject per line and lets any
+# downstream == comparison hit the pointer-equality fast path.
+(_SOFT_OPENERS, _ASK_LINK, _PHISHING_FOLLOWUP, _PHISHING_PAYMENT_FOLLOWUP,
+ _ASK_UPI, _ASK_RECEIVER_OR_COLLECT, _ASK_BANK, _ASK_IFSC_ONLY, _BANK_CONFIRM,
+ _ASK_CONTACT_DETAILS, _OTP_SENDER, _OTP_SMS_TEXT, _OTP_PURPOSE, _OTP_SAFE_ALT,
+ _OTP_FALLBACK, _OTP_MIXED, _BENIGN_HELP, _FOLLOWUPS) = (
+    tuple(map(sys.intern, pool)) for pool in (
+        _SOFT_OPENERS, _ASK_LINK, _PHISHING_FOLLOWUP, _PHISHING_PAYMENT_FOLLOWUP,
+        _ASK_UPI, _ASK_RECEIVER_OR_COLLECT, _ASK_BANK, _ASK_IFSC_ONLY, _BANK_CONFIRM,
+        _ASK_CONTACT_DETAILS, _OTP_SENDER, _OTP_SMS_TEXT, _OTP_PURPOSE, _OTP_SAFE_ALT,
+        _OTP_FALLBACK, _OTP_MIXED, _BENIGN_HELP, _FOLLOWUPS
+    )
+)
+_STAGE_PROMPTS = {k: tuple(map(sys.intern, v)) for k, v in _STAGE_PROMPTS.items()}
+
+if __debug__:
+    # _pick_no_repeat compares lines by plain equality; that is only sound
+    # while no pooled line carries stray whitespace. Checked once at import.
+    assert all(
+        s == s.strip()
+        for pool in (_SOFT_OPENERS, _ASK_LINK, _PHISHING_FOLLOWUP,
+                     _PHISHING_PAYMENT_FOLLOWUP, _ASK_UPI, _ASK_RECEIVER_OR_COLLECT,
+                     _ASK_BANK, _ASK_IFSC_ONLY, _BANK_CONFIRM, _ASK_CONTACT_DETAILS,
+                     _OTP_SENDER, _OTP_SMS_TEXT, _OTP_MIXED, _BENIGN_HELP, _FOLLOWUPS,
+                     *_STAGE_PROMPTS.values())
+        for s in pool
+    )
 
-def _make_rng(session_id: Optional[str], mode: str, stage: str, turn_index: int) -> random.Random:
-    key = f"{session_id or 'no_session'}|{mode}|{stage}|{turn_index}"
-    h = hashlib.sha256(key.encode("utf-8")).hexdigest()
-    seed_int = int(h[:16], 16)
-    return random.Random(seed_int)
+# Goal strings repeated on every reply, lifted and interned once.
+_GOAL_SOFT = sys.intern("Keep scammer engaged and gather more signals without exposure.")
+_GOAL_OTP = sys.intern(
+    "Keep OTP fraud engagement realistic without sharing OTP; gather sender/SMS text/purpose and alternative verification."
+)
+
+# Known-canonical tokens: callers pass these already uppercase, so the
+# normalization in generate_reply can skip .upper()'s fresh allocation for
+# the common case.
+_KNOWN_STAGES = frozenset(s.name for s in Stage)
+_KNOWN_SCAM_TYPES = frozenset((
+    "PHISHING", "OTP_FRAUD", "UPI_FRAUD", "BANK_FRAUD",
+    "SOCIAL_ENGINEERING", "URGENCY", "REWARD_LURE", "GENERIC_SCAM", "UNKNOWN"
+))
+
+# Soft-engagement pools: stage prompt + generic openers, concatenated once at
+# import instead of `[base] + soft_openers` per call. Indexed by Stage value
+# so the hot lookup is a tuple index, not a string-keyed dict hash.
+_SOFT_POOLS_BY_ID = tuple(_STAGE_PROMPTS[s.name] + _SOFT_OPENERS for s in Stage)
+
+# -----------------------------
+# ✅ Intelligence-extraction decision table (built once)
+# -----------------------------
+# The old if/elif waterfall in generate_reply, flattened into an ordered
+# (predicate, pool, goal) table. First matching route wins, same priority
+# order as before. Predicates get (stage_id, gaps, has_payment_intent,
+# has_qr_intent); stage comparisons are integer/bitmask tests on Stage.
+# OTP_FRAUD keeps its own turn-progressive handling as an explicit guard
+# before this table.
+_INTEL_ROUTES = (
+    (lambda sid, g, pay, qr: (g & _HAS_BANK) and not (g & _HAS_IFSC),
+     _ASK_IFSC_ONLY, "Extract missing IFSC to complete bank intelligence."),
+    (lambda sid, g, pay, qr: g & (_HAS_BANK | _HAS_IFSC),
+     _BANK_CONFIRM, "Confirm beneficiary/bank details to strengthen bank intelligence."),
+    # Phishing routes ordered by empirical frequency: the typical phishing
+    # turn already carries the link but no payment detail yet, so that exit
+    # comes first. Predicates are disjoint, so order doesn't change outcomes.
+    (lambda sid, g, pay, qr: sid == Stage.PHISHING and (g & _HAS_LINK) and not ((g & _HAS_UPI) or pay),
+     _PHISHING_FOLLOWUP, "Gather next-step instructions without exposure."),
+    (lambda sid, g, pay, qr: sid == Stage.PHISHING and not (g & _HAS_LINK),
+     _ASK_LINK, "Extract phishing URL for reporting."),
+    (lambda sid, g, pay, qr: sid == Stage.PHISHING,
+     _PHISHING_PAYMENT_FOLLOWUP, "Move phishing into payment flow (receiver/bank details)."),
+    (lambda sid, g, pay, qr: not (g & _HAS_LINK) and (1 << sid) & _LINK_STAGES_MASK,
+     _ASK_LINK, "Extract phishing URL for reporting."),
+    (lambda sid, g, pay, qr: g & _HAS_UPI,
+     _ASK_RECEIVER_OR_COLLECT, "Confirm receiver name / collect / alternate UPI."),
+    (lambda sid, g, pay, qr: not (g & _HAS_UPI) and (pay or sid == Stage.PAYMENT_REQUEST),
+     _ASK_UPI, "Extract UPI ID / receiver handle."),
+    (lambda sid, g, pay, qr: qr and (g & _HAS_UPI),
+     _ASK_RECEIVER_OR_COLLECT, "Extend conversation using QR/collect flow."),
+    (lambda sid, g, pay, qr: not (g & _HAS_BANK),
+     _ASK_BANK, "Extract bank account details."),
+    (lambda sid, g, pay, qr: (g & (_HAS_PHONE | _HAS_EMAIL)) != (_HAS_PHONE | _HAS_EMAIL),
+     _ASK_CONTACT_DETAILS, "Extract contact details for intelligence."),
+    (lambda sid, g, pay, qr: True,
+     _FOLLOWUPS, "Keep conversation alive for more evidence."),
+)
+# Route goals ride along on every reply too — intern them in place.
+_INTEL_ROUTES = tuple((p, pool, sys.intern(goal)) for p, pool, goal in _INTEL_ROUTES)
+
+
+@lru_cache(maxsize=1024)
+def _route_for(sid: Stage, gaps: int, pay: bool, qr: bool):
+    """Memoized route resolution: scammers run scripts, so the same
+    (stage, gaps, intent) signature recurs across sessions and turns.
+    Repeats skip the predicate walk; only the line pick stays per-call so
+    session determinism and the no-repeat guard are untouched."""
+    for predicate, pool, goal in _INTEL_ROUTES:
+        if predicate(sid, gaps, pay, qr):
+            return pool, goal
+
+
+# FNV-1a constants for the reply-RNG seed. The seed only needs to be a
+# deterministic scatter of (session, mode, stage, turn) — not a security
+# boundary — so a 64-bit integer mix replaces the old SHA-256 + hexdigest +
+# int(h[:16], 16) round-trip on every reply.
+_FNV_OFFSET = 0xCBF29CE484222325
+_FNV_PRIME = 0x100000001B3
+_FNV_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+@lru_cache(maxsize=4096)
+def _fnv1a_seed(session_id: str, mode: str, stage: str, turn_index: int) -> int:
+    h = _FNV_OFFSET
+    for part in (session_id, mode, stage, str(turn_index)):
+        for b in part.encode("utf-8"):
+            h = ((h ^ b) * _FNV_PRIME) & _FNV_MASK
+        # separator byte so ("ab","c") and ("a","bc") don't collide
+        h = ((h ^ 0x7C) * _FNV_PRIME) & _FNV_MASK
+    return h
+
+
+def _make_seed(session_id: Optional[str], mode: str, stage: str, turn_index: int) -> int:
+    # The reply path only ever draws once per turn, so a raw 64-bit seed
+    # mixed at pick time replaces constructing a full Mersenne Twister
+    # (2.5 KB of state) just to throw it away after one choice.
+    return _fnv1a_seed(session_id or "no_session", mode, stage, turn_index)
+
+
+# LCG step applied to the seed at pick time so the index doesn't reuse the
+# FNV low bits directly.
+_MIX_MULT = 2862933555777941757
+_MIX_ADD = 3037000493
+
+
+# Module-level RNG for unseeded picks.
+_RNG = random.Random()
 
 
 def _pick(options: List[str], rng: Optional[random.Random] = None) -> str:
-    if not options:
+    # One float draw + truncate instead of choice()/randrange()'s
+    # rejection-sampling loop; the tiny bias is irrelevant for picking
+    # chat-variety lines from pools this small.
+    n = len(options)
+    if not n:
         return ""
-    if rng is None:
-        return random.choice(options)
-    return rng.choice(options)
+    if n == 1:
+        return options[0]
+    r = (rng or _RNG).random()
+    return options[int(r * n)]
 
 
-def _pick_no_repeat(options: List[str], rng: random.Random, last: Optional[str]) -> str:
-    if not options:
+def _pick_no_repeat(options: List[str], seed: int, last: Optional[str]) -> str:
+    n = len(options)
+    if not n:
         return ""
-    choice = rng.choice(options)
-    if last and choice.strip() == last.strip() and len(options) > 1:
-        # deterministic "next" selection (no extra randomness)
-        idx = options.index(choice)
-        return options[(idx + 1) % len(options)]
+    if n == 1:
+        return options[0]
+    idx = ((seed * _MIX_MULT + _MIX_ADD) & _FNV_MASK) % n
+    choice = options[idx]
+    if choice == last:
+        # deterministic "next" selection (no extra randomness); pooled lines
+        # are interned and pre-stripped, so plain equality is enough
+        return options[(idx + 1) % n]
     return choice
 
 
 def _values_only(items: Any) -> List[str]:
-    if not items:
+    if not items or not isinstance(items, list):
         return []
-    if isinstance(items, list):
-        out = []
-        for x in items:
-            if isinstance(x, str):
+    # Probe the first element: extractor output is homogeneous lists of plain
+    # strings, so the common case collapses to one comprehension with no
+    # per-element type dispatch.
+    if type(items[0]) is str:
+        return [s for s in items if s and s.strip()]
+    out = []
+    for x in items:
+        # Exact-type checks: entries are plain str or plain dict, and
+        # `type(x) is str` skips isinstance's subclass machinery.
+        tx = type(x)
+        if tx is str:
+            if x.strip():
                 out.append(x)
-            elif isinstance(x, dict) and "value" in x:
-                out.append(str(x["value"]))
-        return [v for v in out if v and str(v).strip()]
-    return []
-
-
-def _intel_gaps(extracted: Optional[Dict[str, Any]]) -> Dict[str, bool]:
-    extracted = extracted or {}
-
-    upi = _values_only(extracted.get("upiIds"))
-    banks = _values_only(extracted.get("bankAccounts"))
-    ifsc = _values_only(extracted.get("ifscCodes"))
-    links = _values_only(extracted.get("phishingLinks")) or _values_only(extracted.get("links"))
-    phones = _values_only(extracted.get("phoneNumbers"))
-    emails = _values_only(extracted.get("emailIds"))
-
-    has_link = len(links) > 0
-    has_upi = len(upi) > 0
-    has_bank = len(banks) > 0
-    has_ifsc = len(ifsc) > 0
-    has_any_strong = has_upi or has_bank or has_ifsc or has_link
-
-    return {
-        "need_upi": not has_upi,
-        "need_bank": not has_bank,
-        "need_ifsc": not has_ifsc,
-        "need_link": not has_link,
-        "need_phone": len(phones) == 0,
-        "need_email": len(emails) == 0,
-        "has_link": has_link,
-        "has_upi": has_upi,
-        "has_bank": has_bank,
-        "has_ifsc": has_ifsc,
-        "has_any_strong": has_any_strong,
-    }
+        elif tx is dict:
+            v = x.get("value")
+            if v:
+                v = str(v)
+                if v.strip():
+                    out.append(v)
+    return out
+
+
+def _has_value(items: Any) -> bool:
+    """Emptiness probe: True on the first usable value, no list materialization."""
+    if not items or not isinstance(items, list):
+        return False
+    for x in items:
+        if isinstance(x, str):
+            if x.strip():
+                return True
+        elif isinstance(x, dict):
+            v = x.get("value")
+            if v and str(v).strip():
+                return True
+    return False
+
+
+# Gap bitmask bits: set bit = that intel field is present. need_<field> is
+# simply the absence of the bit, so one int replaces the old 11-key dict of
+# bools and every check becomes a single AND.
+_HAS_UPI = 1
+_HAS_BANK = 2
+_HAS_IFSC = 4
+_HAS_LINK = 8
+_HAS_PHONE = 16
+_HAS_EMAIL = 32
+_HAS_ANY_STRONG = _HAS_UPI | _HAS_BANK | _HAS_IFSC | _HAS_LINK
+
+
+# Field spec driving _intel_gaps: (extracted key, presence bit).
+_GAP_FIELDS = (
+    ("upiIds", _HAS_UPI),
+    ("bankAccounts", _HAS_BANK),
+    ("ifscCodes", _HAS_IFSC),
+    ("phishingLinks", _HAS_LINK),
+    ("phoneNumbers", _HAS_PHONE),
+    ("emailIds", _HAS_EMAIL),
+)
+
+
+def _intel_gaps(extracted: Dict[str, Any]) -> int:
+    # Callers normalize None away at their public boundaries
+    # (generate_reply / agent_decision), so no defensive re-check here.
+    # Only booleans are needed here, so probe for presence instead of
+    # materializing value lists via _values_only and checking len().
+    # Bound-method local skips one attribute lookup per field.
+    get = extracted.get
+    mask = 0
+    for key, bit in _GAP_FIELDS:
+        if _has_value(get(key)):
+            mask |= bit
+    # Legacy payloads carried links under "links" instead of "phishingLinks".
+    if not (mask & _HAS_LINK) and _has_value(get("links")):
+        mask |= _HAS_LINK
+    return mask
+
+
+class Reply(NamedTuple):
+    """Fixed-shape reply pack from generate_reply (same rationale as
+    Decision: tuple construction beats a fresh 2-key dict per call)."""
+    agentReply: Optional[str]
+    agentGoal: str
+
+
+# Shared no-op for the mode fallthrough — immutable, so one instance serves
+# every call that reaches the tail.
+_NOOP_REPLY = Reply(None, "No action needed.")
 
 
 def generate_reply(
@@ -94,188 +442,138 @@ def generate_reply(
     extracted: Optional[Dict[str, Any]] = None,
     session_id: Optional[str] = None,
     turn_index: int = 1,
-    last_agent_reply: Optional[str] = None
-) -> Dict[str, str]:
-    stage = (stage or "UNKNOWN").upper()
-    scam_type = (scam_type or "UNKNOWN").upper()
+    last_agent_reply: Optional[str] = None,
+    gaps: Optional[int] = None
+) -> Reply:
+    if stage not in _KNOWN_STAGES:
+        stage = (stage or "UNKNOWN").upper()
+    if scam_type not in _KNOWN_SCAM_TYPES:
+        scam_type = (scam_type or "UNKNOWN").upper()
     extracted = extracted or {}
 
-    rng = _make_rng(session_id, mode, stage, turn_index)
+    seed = _make_seed(session_id, mode, stage, turn_index)
 
-    gaps = _intel_gaps(extracted)
-    has_payment_intent = bool(extracted.get("hasPaymentIntent", False))
-    has_qr_intent = bool(extracted.get("hasQRIntent", False))
+    # agent_decision already computed gaps for its evidence gate; reuse them
+    # instead of recomputing on the same dict.
+    if gaps is None:
+        gaps = _intel_gaps(extracted)
+    # Missing key is already falsy; `not not` coerces to bool without the
+    # redundant default object + bool() call (the flags key _route_for's cache).
+    has_payment_intent = not not extracted.get("hasPaymentIntent")
+    has_qr_intent = not not extracted.get("hasQRIntent")
 
-    benign_help = [
-        "Aap kaunsa app use karte ho (GPay/PhonePe/Paytm)? Main safe steps bata deta hoon.",
-        "UPI PIN reset ke liye app me ‘Forgot UPI PIN’ / ‘Reset PIN’ option hota hai—kaunsa app hai?",
-        "PIN reset ke liye debit card details + OTP lagta hai. Aap kaunsa bank/app use kar rahe ho?",
-        "Aapka issue exactly kya hai—payment fail, PIN issue, ya account warning?",
-        "App me error code aa raha hai kya? (Bas code bata do.)"
-    ]
-
-    soft_openers = [
-        "I’m a bit confused. Can you explain what I need to do?",
-        "Okay… what exactly is the issue with my account?",
-        "I don’t understand this. What should I do step by step?",
-        "Wait—ye message kis number/email se aaya hai?",
-        "Aap bol rahe ho verify… but verify kis cheez ka?"
-    ]
-
-    ask_link = [
-        "Can you send the official verification link again? The page didn’t open.",
-        "Please share the exact link. I want to make sure I’m on the right site.",
-        "The link isn’t loading—send the correct URL once more.",
-        "Mere phone pe link broken aa raha hai—copy-paste karke dubara bhejo."
-    ]
-
-    phishing_followup = [
-        "I opened it. It’s asking for details—what exactly should I fill?",
-        "It’s asking for OTP/UPI PIN—are you sure this is required?",
-        "It’s asking for netbanking/login—verification me login kyu chahiye?"
-    ]
-
-    phishing_payment_followup = [
-        "UPI me receiver name kya dikh raha hai? I want to confirm before paying.",
-        "Payment fail ho gaya to kya bank transfer karna hai? Account + IFSC bhej do.",
-        "Amount kitna exactly dalna hai? And receiver name confirm kar do."
-    ]
-
-    ask_upi = [
-        "Which exact UPI ID should I use? Please send it again.",
-        "Can you share the UPI handle (like name@bank) so I don’t type wrong?",
-        "UPI ID ke saath receiver name bhi bata do—confirm karna hai."
-    ]
-
-    ask_receiver_or_collect = [
-        "Receiver name kya aayega? (UPI pe jo name show hota hai) I want to confirm.",
-        "Can you send a collect request? I’m not able to type the UPI ID correctly.",
-        "If this UPI fails, do you have another UPI ID I can try?"
-    ]
-
-    ask_bank = [
-        "If UPI isn’t working, can you share bank details (A/C + IFSC + name)?",
-        "Please send the account number and IFSC—my app asks for those.",
-        "Can you share beneficiary bank details so I can complete verification?"
-    ]
-
-    ask_ifsc_only = [
-        "IFSC code bhi bhej do please. App IFSC maang raha hai.",
-        "Receiver bank ka IFSC kya hai? Without IFSC it’s not allowing."
-    ]
-
-    bank_confirm = [
-        "Thanks. Beneficiary name exactly kya hai? (bank me jo name show hota hai)",
-        "Which bank/branch is this IFSC for? I want to confirm before transfer.",
-        "Account type savings/current kya hai? Wrong type se fail ho jata hai."
-    ]
-
-    ask_contact_details = [
-        "Aapka support number kya hai? Call karke confirm karna hai.",
-        "Official email ID bhej do, I’ll forward screenshot there.",
-        "Koi ticket/reference number hai? Main note kar leta hoon."
-    ]
-
-    otp_sender_bucket = [
-        "Message me sender name kya dikh raha hai? Main confirm karna chahta hoon.",
-        "OTP wale SMS me sender ID kya hai? (SBI/VM-… ) bas bata do.",
-        "SMS me bank ka naam clear likha hai kya? Sender ID kya show ho raha hai?"
-    ]
-    otp_sms_text_bucket = [
-        "OTP aaya hai—but SMS me exact line kya likhi hai? Copy karke bhejo.",
-        "OTP SMS me time/validity kitni likhi hai? 5 min/10 min?",
-        "SMS me ‘for login’ ya ‘for payment’ aisa kuch likha hai kya? Exact words batao."
-    ]
-    otp_purpose_bucket = [
-        "OTP share karna safe nahi lag raha. Ye login ka OTP hai ya payment ka?",
-        "Ye OTP account access ke liye hai ya transaction confirm karne ke liye?",
-        "App me aapne kya action kiya jisse OTP aaya? Link open kiya ya payment click?"
-    ]
-    otp_safe_alt_bucket = [
-        "Main OTP nahi share kar sakta—kya aap alternative verification (reference number) de sakte ho?",
-        "OTP share nahi karunga—koi customer care number do, main call karke confirm kar leta hoon.",
-        "OTP ke bina koi verification step hai? Like registered email confirm ya ticket number?"
-    ]
-    otp_followup_fallback = [
-        "Ek baar confirm: OTP kis service/app ke liye generate hua? (SBI YONO / netbanking / UPI?)",
-        "OTP ke SMS me last 4 digits ya masked info aata hai kya? (Bas confirm karna.)",
-        "OTP me kisi merchant ka naam dikh raha? Agar haan to kaunsa?"
-    ]
-
-    def _otp_progressive_reply(ti: int) -> str:
-        if ti <= 1:
-            return _pick_no_repeat(otp_sender_bucket, rng, last_agent_reply)
-        if ti == 2:
-            return _pick_no_repeat(otp_sms_text_bucket, rng, last_agent_reply)
-        if ti == 3:
-            return _pick_no_repeat(otp_purpose_bucket, rng, last_agent_reply)
-
-        pool = otp_safe_alt_bucket + otp_purpose_bucket + otp_followup_fallback
-        return _pick_no_repeat(pool, rng, last_agent_reply)
-
-    stage_prompts = {
-        "RECON": ["Hi, yes—what is this about?", "Hello. Which service are you calling from?"],
-        "SOCIAL_ENGINEERING": ["I’m worried now. What verification is needed?", "Why is my account suspended? I didn’t do anything."],
-        "URGENCY": ["Okay okay, I don’t want it blocked. What do I do now?", "Please guide quickly. I’m not technical."],
-        "PAYMENT_REQUEST": ["You’re asking payment… I need exact details so I don’t make a mistake.", "I can do it, but tell me the exact ID/link."],
-        "PHISHING": ["I clicked but it looks different.", "The site is asking too many things."],
-        "OTP_FRAUD": ["OTP? But why OTP is needed for this?", "I got OTP, but I’m scared to share. What is it for?"],
-        "REWARD_LURE": ["Really? What do I need to do to claim it?", "Okay… what’s the process for the reward?"],
-        "BENIGN": ["Haan bolo—kya help chahiye?", "Okay, I can help. What exactly is the issue?"],
-        "UNKNOWN": ["Can you clarify what you need from me?", "What is this regarding? Please explain."]
-    }
-
-    base = _pick_no_repeat(stage_prompts.get(stage, stage_prompts["UNKNOWN"]), rng, last_agent_reply)
+    # Resolve the stage string to its Stage int once; both mode handlers
+    # work in integer space from here on.
+    sid = _STAGE_ID.get(stage, Stage.UNKNOWN)
 
     if mode == "SOFT_ENGAGEMENT":
-        reply = _pick_no_repeat([base] + soft_openers, rng, last_agent_reply)
-        return {"agentReply": reply, "agentGoal": "Keep scammer engaged and gather more signals without exposure."}
+        return _reply_soft(sid, seed, last_agent_reply)
 
     if mode == "INTELLIGENCE_EXTRACTION":
-        if stage == "OTP_FRAUD":
-            return {
-                "agentReply": _otp_progressive_reply(turn_index),
-                "agentGoal": "Keep OTP fraud engagement realistic without sharing OTP; gather sender/SMS text/purpose and alternative verification."
-            }
-
-        if gaps["has_bank"] or gaps["has_ifsc"]:
-            if gaps["need_ifsc"] and (not gaps["need_bank"]):
-                return {"agentReply": _pick_no_repeat(ask_ifsc_only, rng, last_agent_reply), "agentGoal": "Extract missing IFSC to complete bank intelligence."}
-            return {"agentReply": _pick_no_repeat(bank_confirm, rng, last_agent_reply), "agentGoal": "Confirm beneficiary/bank details to strengthen bank intelligence."}
-
-        if stage == "PHISHING":
-            if gaps["need_link"]:
-                return {"agentReply": _pick_no_repeat(ask_link, rng, last_agent_reply), "agentGoal": "Extract phishing URL for reporting."}
-            if gaps["has_upi"] or has_payment_intent:
-                return {"agentReply": _pick_no_repeat(phishing_payment_followup, rng, last_agent_reply), "agentGoal": "Move phishing into payment flow (receiver/bank details)."}
-            return {"agentReply": _pick_no_repeat(phishing_followup, rng, last_agent_reply), "agentGoal": "Gather next-step instructions without exposure."}
-
-        if gaps["need_link"] and stage in ["SOCIAL_ENGINEERING", "URGENCY"]:
-            return {"agentReply": _pick_no_repeat(ask_link, rng, last_agent_reply), "agentGoal": "Extract phishing URL for reporting."}
-
-        if gaps["has_upi"]:
-            return {"agentReply": _pick_no_repeat(ask_receiver_or_collect, rng, last_agent_reply), "agentGoal": "Confirm receiver name / collect / alternate UPI."}
-
-        if gaps["need_upi"] and (has_payment_intent or stage == "PAYMENT_REQUEST"):
-            return {"agentReply": _pick_no_repeat(ask_upi, rng, last_agent_reply), "agentGoal": "Extract UPI ID / receiver handle."}
-
-        if has_qr_intent and (not gaps["need_upi"]):
-            return {"agentReply": _pick_no_repeat(ask_receiver_or_collect, rng, last_agent_reply), "agentGoal": "Extend conversation using QR/collect flow."}
-
-        if gaps["need_bank"]:
-            return {"agentReply": _pick_no_repeat(ask_bank, rng, last_agent_reply), "agentGoal": "Extract bank account details."}
+        return _reply_intel(
+            sid, gaps, has_payment_intent, has_qr_intent,
+            seed, turn_index, last_agent_reply
+        )
 
-        if gaps["need_phone"] or gaps["need_email"]:
-            return {"agentReply": _pick_no_repeat(ask_contact_details, rng, last_agent_reply), "agentGoal": "Extract contact details for intelligence."}
+    return _NOOP_REPLY
+
+
+def _otp_progressive_reply(seed: int, ti: int, last: Optional[str]) -> str:
+    bucket = _OTP_BY_TURN[ti] if 0 <= ti <= 3 else _OTP_MIXED
+    return _pick_no_repeat(bucket, seed, last)
+
+
+def _reply_soft(sid: Stage, seed: int, last_agent_reply: Optional[str]) -> Reply:
+    """Mode-specialized SOFT_ENGAGEMENT path (no mode compare, no dead branches)."""
+    return Reply(_pick_no_repeat(_SOFT_POOLS_BY_ID[sid], seed, last_agent_reply), _GOAL_SOFT)
+
+
+def _reply_intel(
+    sid: Stage,
+    gaps: int,
+    has_payment_intent: bool,
+    has_qr_intent: bool,
+    seed: int,
+    turn_index: int,
+    last_agent_reply: Optional[str]
+) -> Reply:
+    """Mode-specialized INTELLIGENCE_EXTRACTION path driven by _INTEL_ROUTES."""
+    if sid == Stage.OTP_FRAUD:
+        return Reply(_otp_progressive_reply(seed, turn_index, last_agent_reply), _GOAL_OTP)
+
+    pool, goal = _route_for(sid, gaps, has_payment_intent, has_qr_intent)
+    return Reply(_pick_no_repeat(pool, seed, last_agent_reply), goal)
+
+
+class Decision(NamedTuple):
+    """Fixed-shape agent decision. NamedTuple construction is a C-level tuple
+    fast path (~4x lighter than an 8-key dict); use ._asdict() at a JSON
+    boundary if a plain dict is ever needed."""
+    activated: bool
+    riskLevel: str
+    action: str
+    agentMode: str
+    message: str
+    agentReply: Optional[str]
+    agentGoal: str
+    persona: Optional[str] = None
+
+
+# Decision tiers for agent_decision: 3 = high confidence, 2 = medium with
+# hard evidence, 1 = medium, 0 = low/unconfirmed.
+@lru_cache(maxsize=512)
+def _decision_template(tier: int, scam_type: Optional[str], stage: Optional[str]) -> Decision:
+    """Frozen (cached) per-(tier, type, stage) skeleton of the decision dict.
+
+    Everything except agentReply/agentGoal is identical across calls with the
+    same inputs, so build the message f-string once and reuse. Callers
+    ._replace() in the per-call fields.
+    """
+    if tier == 3:
+        return Decision(
+            activated=True,
+            riskLevel="HIGH",
+            action="ENGAGE",
+            agentMode="INTELLIGENCE_EXTRACTION",
+            message=f"High confidence {scam_type} detected at {stage} stage",
+            agentReply=None,
+            agentGoal="",
+            persona=_PERSONA_STYLE
+        )
+    if tier == 2:
+        return Decision(
+            activated=True,
+            riskLevel="HIGH",
+            action="ENGAGE",
+            agentMode="INTELLIGENCE_EXTRACTION",
+            message=f"Evidence present. Continuing extraction for {scam_type}.",
+            agentReply=None,
+            agentGoal="",
+            persona=_PERSONA_STYLE
+        )
+    return Decision(
+        activated=True,
+        riskLevel="MEDIUM",
+        action="MONITOR",
+        agentMode="SOFT_ENGAGEMENT",
+        message=f"Possible {scam_type}. Monitoring conversation",
+        agentReply=None,
+        agentGoal="",
+        persona=_PERSONA_STYLE
+    )
 
-        followups = [
-            "Okay, I noted that. What’s the next step?",
-            "Done. If it fails again, what should I do?",
-            "Can you confirm receiver name once more?"
-        ]
-        return {"agentReply": _pick_no_repeat(followups, rng, last_agent_reply), "agentGoal": "Keep conversation alive for more evidence."}
 
-    return {"agentReply": None, "agentGoal": "No action needed."}
+# Shared sentinel for the common low-score exit: Decision is immutable, so
+# one prebuilt instance can be returned with zero per-call allocation.
+_NOT_CONFIRMED = Decision(
+    activated=False,
+    riskLevel="LOW",
+    action="MONITOR",
+    agentMode="PASSIVE",
+    message="Suspicious but not confirmed",
+    agentReply=None,
+    agentGoal="Wait for more signals."
+)
 
 
 def agent_decision(
@@ -284,7 +582,7 @@ def agent_decision(
     extracted_intelligence: Optional[dict] = None,
     session_id: Optional[str] = None,
     last_agent_reply: Optional[str] = None
-) -> Dict[str, Any]:
+) -> Decision:
 
     extracted_intelligence = extracted_intelligence or {}
     conversation_history = conversation_history or []
@@ -292,98 +590,63 @@ def agent_decision(
     turn_index = max(1, len(conversation_history) + 1)
 
     if not analysis.get("scamDetected", False):
-        benign_rng = _make_rng(session_id, "BENIGN_HELP", "BENIGN", turn_index)
-        benign_help = [
-            "Aap kaunsa app use karte ho (GPay/PhonePe/Paytm)? Main safe steps bata deta hoon.",
-            "UPI PIN reset ke liye app me ‘Forgot UPI PIN’ / ‘Reset PIN’ option hota hai—kaunsa app hai?",
-            "PIN reset ke liye debit card details + OTP lagta hai. Aap kaunsa bank/app use kar rahe ho?",
-            "Aapka issue exactly kya hai—payment fail, PIN issue, ya account warning?"
-        ]
-        return {
-            "activated": False,
-            "riskLevel": "LOW",
-            "action": "ALLOW",
-            "agentMode": "PASSIVE",
-            "message": "No scam indicators detected",
-            "agentReply": _pick_no_repeat(benign_help, benign_rng, last_agent_reply),
-            "agentGoal": "Help user safely (benign).",
-            "persona": PERSONA["style"]
-        }
+        benign_seed = _make_seed(session_id, "BENIGN_HELP", "BENIGN", turn_index)
+        return Decision(
+            activated=False,
+            riskLevel="LOW",
+            action="ALLOW",
+            agentMode="PASSIVE",
+            message="No scam indicators detected",
+            agentReply=_pick_no_repeat(_BENIGN_HELP, benign_seed, last_agent_reply),
+            agentGoal="Help user safely (benign).",
+            persona=_PERSONA_STYLE
+        )
 
     score = float(analysis.get("confidenceScore", 0.0))
     scam_type = analysis.get("scamType")
     stage = analysis.get("scamStage")
 
     gaps = _intel_gaps(extracted_intelligence)
-    evidence_lock = (
-        gaps["has_any_strong"]
-        or bool(extracted_intelligence.get("hasPaymentIntent"))
-        or bool(extracted_intelligence.get("hasQRIntent"))
-    )
+    has_payment_intent = not not extracted_intelligence.get("hasPaymentIntent")
+    has_qr_intent = not not extracted_intelligence.get("hasQRIntent")
+    evidence_lock = bool(gaps & _HAS_ANY_STRONG) or has_payment_intent or has_qr_intent
 
+    # Bucket the score once: 3 = high, 2 = medium with hard evidence,
+    # 1 = medium, 0 = unconfirmed. One generate_reply call and one template
+    # fill replace the three near-identical branches this used to be.
     if score >= 0.8:
-        reply_pack = generate_reply(
-            "INTELLIGENCE_EXTRACTION",
-            stage, scam_type, extracted_intelligence,
-            session_id=session_id,
-            turn_index=turn_index,
-            last_agent_reply=last_agent_reply
-        )
-        return {
-            "activated": True,
-            "riskLevel": "HIGH",
-            "action": "ENGAGE",
-            "agentMode": "INTELLIGENCE_EXTRACTION",
-            "message": f"High confidence {scam_type} detected at {stage} stage",
-            "agentReply": reply_pack["agentReply"],
-            "agentGoal": reply_pack["agentGoal"],
-            "persona": PERSONA["style"]
-        }
-
-    if score >= 0.5 and evidence_lock:
-        reply_pack = generate_reply(
-            "INTELLIGENCE_EXTRACTION",
-            stage, scam_type, extracted_intelligence,
-            session_id=session_id,
-            turn_index=turn_index,
-            last_agent_reply=last_agent_reply
+        tier = 3
+    elif score >= 0.5:
+        tier = 2 if evidence_lock else 1
+    else:
+        return _NOT_CONFIRMED
+
+    # Call the mode-specialized handlers directly — agent_decision already
+    # knows the mode, gaps, and intent flags, so the generate_reply dispatch
+    # frame (kept for external callers) is skipped. The mode string still
+    # seeds the RNG so replies stay identical to the dispatcher path.
+    if stage not in _KNOWN_STAGES:
+        stage = (stage or "UNKNOWN").upper()
+    mode = "INTELLIGENCE_EXTRACTION" if tier >= 2 else "SOFT_ENGAGEMENT"
+    seed = _make_seed(session_id, mode, stage, turn_index)
+    sid = _STAGE_ID.get(stage, Stage.UNKNOWN)
+    if tier >= 2:
+        reply_pack = _reply_intel(
+            sid, gaps, has_payment_intent, has_qr_intent,
+            seed, turn_index, last_agent_reply
         )
-        return {
-            "activated": True,
-            "riskLevel": "HIGH",
-            "action": "ENGAGE",
-            "agentMode": "INTELLIGENCE_EXTRACTION",
-            "message": f"Evidence present. Continuing extraction for {scam_type}.",
-            "agentReply": reply_pack["agentReply"],
-            "agentGoal": reply_pack["agentGoal"],
-            "persona": PERSONA["style"]
-        }
-
-    if score >= 0.5:
-        reply_pack = generate_reply(
-            "SOFT_ENGAGEMENT",
-            stage, scam_type, extracted_intelligence,
-            session_id=session_id,
-            turn_index=turn_index,
-            last_agent_reply=last_agent_reply
-        )
-        return {
-            "activated": True,
-            "riskLevel": "MEDIUM",
-            "action": "MONITOR",
-            "agentMode": "SOFT_ENGAGEMENT",
-            "message": f"Possible {scam_type}. Monitoring conversation",
-            "agentReply": reply_pack["agentReply"],
-            "agentGoal": reply_pack["agentGoal"],
-            "persona": PERSONA["style"]
-        }
-
-    return {
-        "activated": False,
-        "riskLevel": "LOW",
-        "action": "MONITOR",
-        "agentMode": "PASSIVE",
-        "message": "Suspicious but not confirmed",
-        "agentReply": None,
-        "agentGoal": "Wait for more signals."
-    }
\ No newline at end of file
+    else:
+        reply_pack = _reply_soft(sid, seed, last_agent_reply)
+    return _decision_template(tier, scam_type, stage)._replace(
+        agentReply=reply_pack.agentReply,
+        agentGoal=reply_pack.agentGoal
+    )
+
+def warmup() -> None:
+    """Touch every (mode, stage) reply path once so a fresh worker pays the
+    table faults and LRU fills at startup, not on the first live scammer."""
+    for mode in ("SOFT_ENGAGEMENT", "INTELLIGENCE_EXTRACTION"):
+        for s in Stage:
+            generate_reply(mode, s.name, "GENERIC_SCAM", {}, session_id="warmup", turn_index=1)
+    for tier in (1, 2, 3):
+        _decision_template(tier, "GENERIC_SCAM", "UNKNOWN")
@@ -9,10 +9,16 @@ from fastapi import FastAPI, Header, HTTPException
 from app.schemas import IncomingMessage
 from app.detector import detect_scam
 from app.extractor import extract_features
-from app.agent import agent_decision
+from app.agent import agent_decision, warmup as agent_warmup
 
 app = FastAPI(title="Agentic Honeypot API")
 
+
+@app.on_event("startup")
+def _warm_agent_tables():
+    # ✅ pay reply-table faults and LRU fills once per worker, not on turn 1
+    agent_warmup()
+
 API_KEY = os.getenv("HONEYPOT_API_KEY", "Honeypot2026@Krushna")
 
 GUVI_CALLBACK_URL = os.getenv(
@@ -298,7 +304,7 @@ def receive_message(
     conversation_turns = current_turn
     total_messages_exchanged = conversation_turns * 2
 
-    reply_text = agent_result.get("agentReply")
+    reply_text = agent_result.agentReply
     if reply_text:
         SESSION_STORE[session_id]["lastAgentReply"] = reply_text
 
@@ -326,7 +332,7 @@ def receive_message(
         suspicious_keywords = (detection.get("indicators", {}) or {}).get("keywords", []) or []
         agent_notes = (
             f"Stage={detection.get('scamStage')} Type={detection.get('scamType')}. "
-            f"AgentMode={agent_result.get('agentMode')} Action={agent_result.get('action')}. "
+            f"AgentMode={agent_result.agentMode} Action={agent_result.action}. "
             f"CollectedIntel={('yes' if has_intel else 'no')}. "
             f"Cluster={stable_cluster_id or 'none'}"
         )